@@ -1,173 +1,355 @@
+import functools
+import itertools
 import random
-import re
-from collections import defaultdict
+import string
+import sys
+from collections import Counter, defaultdict
 from colorama import Fore, Back, Style, init
 import time
 
-# Initialize colorama
-init(autoreset=True)
+_colorama_initialized = False
+
+def _init_colorama():
+    """Initialize colorama once, on the first game that prints in color"""
+    global _colorama_initialized
+    if not _colorama_initialized:
+        init(autoreset=True)
+        _colorama_initialized = True
+
+# Maps the b'0'/b'1' digits of bin() to 0/1 bytes usable as compress() selectors
+_BIT_SELECTORS = bytes.maketrans(b'01', b'\x00\x01')
+
+_ALL_LETTERS = (1 << 26) - 1
+
+def _bit_selectors(mask):
+    """compress() selectors for a non-negative mask: byte i is 1 iff bit i is set"""
+    # bin() lists bits high to low, so reverse it
+    return bin(mask)[:1:-1].encode('ascii').translate(_BIT_SELECTORS)
+
+def _letters_to_mask(letters):
+    """Pack lowercase letters into a 26-bit int, bit ord(c) - 97 per letter"""
+    mask = 0
+    for c in letters:
+        mask |= 1 << (ord(c) - 97)
+    return mask
+
+def _mask_to_letters(mask):
+    """Unpack a 26-bit letter mask back into a string of letters, in alphabetical order"""
+    return ''.join(itertools.compress(string.ascii_lowercase, _bit_selectors(mask)))
 
 class HangmanGame:
-    def __init__(self, word_list_file="words.txt"):
+    def __init__(self, word_list_file="words.txt", quiet=False):
+        # quiet skips colorama, the board display and the AI typing delays,
+        # e.g. for benchmarking the AI
+        self.quiet = quiet
+        if not quiet:
+            _init_colorama()
+        self._pfx_input = self._color(Fore.MAGENTA) + "Input: "
+        self._pfx_correct = self._color(Fore.GREEN) + " -> Correct!\n"
+        self._pfx_wrong = self._color(Fore.RED) + " -> Wrong! "
+
         # Load words from file
-        with open(word_list_file) as f:
-            self.all_words = [word.strip().lower() for word in f.readlines()]
+        with open(word_list_file, encoding='utf-8') as f:
+            words = f.read().lower().split()
+        # Only a-z words can be guessed, so skip anything else rather than alter it;
+        # drop duplicates (keeping first-seen order) so they don't widen every bitset
+        words = [w for w in dict.fromkeys(words) if w.isascii() and w.isalpha()]
         
-        # Organize words by length
-        self.words_by_length = defaultdict(list)
-        for word in self.all_words:
-            self.words_by_length[len(word)].append(word)
+        # Organize words by length; these lists only live until the index is built
+        words_by_length = defaultdict(list)
+        for word in words:
+            words_by_length[len(word)].append(word)
+        # Every word in a bucket has the same length, so each bucket is stored as
+        # one contiguous string; word i of length L is buf[i * L:(i + 1) * L]
+        self.words_by_length_buf = {length: ''.join(words) for length, words in words_by_length.items()}
         
         # Precompute letter frequencies for each word length
         self.letter_frequencies = {}
-        for length, words in self.words_by_length.items():
-            freq = defaultdict(int)
-            for word in words:
-                for letter in word:
-                    freq[letter] += 1
-            # Convert to sorted list of (letter, count) tuples
-            sorted_freq = sorted(freq.items(), key=lambda x: -x[1])
-            self.letter_frequencies[length] = sorted_freq
+        for length, buf in self.words_by_length_buf.items():
+            # Counter does the per-letter tally in C; most_common gives sorted (letter, count) tuples
+            self.letter_frequencies[length] = Counter(buf).most_common()
+
+        # Bitset index: bit i stands for word i of self.words_by_length_buf[length].
+        # pattern_bits maps (letter, position mask) to the words holding that
+        # letter at exactly those positions and nowhere else
+        self.pattern_bits = {}
+        self.contains_bits = {}
+        # 26-bit mask of the letters that occur in any word of each length
+        self.length_letter_mask = {}
+        for length, words in words_by_length.items():
+            patterns = defaultdict(int)
+            contains = defaultdict(int)
+            for i, word in enumerate(words):
+                bit = 1 << i
+                positions = defaultdict(int)
+                for pos, letter in enumerate(word):
+                    positions[letter] |= 1 << pos
+                for letter, pos_mask in positions.items():
+                    patterns[letter, pos_mask] |= bit
+                    contains[letter] |= bit
+            self.pattern_bits[length] = dict(patterns)
+            # Indexed by letter (ord(c) - 97) so scoring can map over them in order
+            self.contains_bits[length] = [contains.get(chr(97 + i), 0) for i in range(26)]
+            self.length_letter_mask[length] = _letters_to_mask(contains)
+
+        # (masked_word, guessed_mask, candidate_mask) of the last candidate query.
+        # Cached guesses skip the query, so this may lag behind; _extends only
+        # reuses it when the new query is a strict refinement, which stays exact
+        self._last = None
+        # Best letter index per (masked_word, guessed_mask), shared across games
+        self._best_letter_cache = {}
     
+    @functools.cached_property
+    def words_by_length(self):
+        """Words grouped by length, sliced out of words_by_length_buf on first access"""
+        return {length: [buf[start:start + length] for start in range(0, len(buf), length)]
+                for length, buf in self.words_by_length_buf.items()}
+
+    @functools.cached_property
+    def all_words(self):
+        """Every dictionary word, grouped by length, built on first access"""
+        return [word for words in self.words_by_length.values() for word in words]
+
     def select_random_word(self, min_length=4, max_length=8):
-        valid_words = [w for w in self.all_words if min_length <= len(w) <= max_length]
-        return random.choice(valid_words)
+        # Pick a length weighted by bucket size, so every valid word stays equally likely
+        lengths = [length for length in range(min_length, max_length + 1) if self.words_by_length_buf.get(length)]
+        weights = [len(self.words_by_length_buf[length]) // length for length in lengths]
+        length = random.choices(lengths, weights=weights, k=1)[0]
+        start = random.randrange(0, len(self.words_by_length_buf[length]), length)
+        return self.words_by_length_buf[length][start:start + length]
     
-    def get_possible_words(self, masked_word, guessed_letters):
-        if not guessed_letters:
-            pattern = ''.join([c if c != '_' else '.' for c in masked_word])
-        else:
-            pattern = ''.join([c if c != '_' else f"[^{''.join(guessed_letters)}]" for c in masked_word])
-
-        regex = re.compile(f"^{pattern}$")
+    def get_candidate_mask(self, masked_word, guessed_mask):
+        """Bitmask over the words of len(masked_word) matching the masked word"""
         length = len(masked_word)
+        buf = self.words_by_length_buf.get(length)
+        if not buf:
+            return 0
+        patterns = self.pattern_bits[length]
+        contains = self.contains_bits[length]
 
-        # Filter words from full word list, not just by length, since length may include spaces
-        return [word for word in self.all_words if len(word) == length and regex.match(word)]
+        revealed = defaultdict(int)
+        for pos, c in enumerate(masked_word):
+            if c != '_':
+                revealed[c] |= 1 << pos
 
-    def get_best_guess(self, masked_word, guessed_letters):
+        last = self._last
+        if last is not None and self._extends(last, masked_word, guessed_mask):
+            # Candidates only shrink within a game: start from the previous
+            # mask and apply just the newly guessed letters
+            mask = last[2]
+            new_letters = guessed_mask & ~last[1]
+            while new_letters:
+                low = new_letters & -new_letters
+                new_letters ^= low
+                idx = low.bit_length() - 1
+                pos_mask = revealed.get(chr(97 + idx))
+                if pos_mask:
+                    mask &= patterns.get((chr(97 + idx), pos_mask), 0)
+                else:
+                    mask &= ~contains[idx]
+            self._last = (masked_word, guessed_mask, mask)
+            return mask
+
+        mask = (1 << (len(buf) // length)) - 1
+        # Revealed letters must sit at exactly the revealed positions, which
+        # also keeps them out of every blank
+        for c, pos_mask in revealed.items():
+            mask &= patterns.get((c, pos_mask), 0)
+        if mask:
+            # Guessed letters that weren't revealed must be absent from the word
+            absent = guessed_mask & ~_letters_to_mask(revealed)
+            while absent:
+                low = absent & -absent
+                absent ^= low
+                mask &= ~contains[low.bit_length() - 1]
+        self._last = (masked_word, guessed_mask, mask)
+        return mask
+
+    @staticmethod
+    def _extends(last, masked_word, guessed_mask):
+        """Whether (masked_word, guessed_mask) only adds newly guessed letters to the last query"""
+        last_masked, last_guessed, _ = last
+        if len(last_masked) != len(masked_word) or guessed_mask & last_guessed != last_guessed:
+            return False
+        new_letters = guessed_mask & ~last_guessed
+        for old, c in zip(last_masked, masked_word):
+            if old != c and (old != '_' or c not in string.ascii_lowercase
+                             or not new_letters >> (ord(c) - 97) & 1):
+                return False
+        return True
+
+    def get_possible_words(self, masked_word, guessed_mask):
+        mask = self.get_candidate_mask(masked_word, guessed_mask)
+        if not mask:
+            return []
+        length = len(masked_word)
+        buf = self.words_by_length_buf.get(length, '')
+        # Bit i selects word i
+        starts = itertools.compress(range(0, len(buf), length), _bit_selectors(mask))
+        return [buf[start:start + length] for start in starts]
+
+    def get_best_guess(self, masked_word, guessed_mask):
         length = len(masked_word)
     
         # If no letters guessed yet, use precomputed frequencies
-        if not guessed_letters:
+        if not guessed_mask:
             return self.letter_frequencies[length][0][0] if self.letter_frequencies.get(length) else None
     
-        possible_words = self.get_possible_words(masked_word, guessed_letters)
+        key = (masked_word, guessed_mask)
+        idx = self._best_letter_cache.get(key)
+        if idx is None:
+            if len(self._best_letter_cache) >= 4096:
+                self._best_letter_cache.clear()
+            idx = self._best_letter_cache[key] = self._best_letter_index(masked_word, guessed_mask)
+        return chr(97 + idx) if idx >= 0 else None
+
+    def _best_letter_index(self, masked_word, guessed_mask):
+        """Index (0-25) of the unguessed letter in the most candidate words, or -1 if none"""
+        mask = self.get_candidate_mask(masked_word, guessed_mask)
     
-        if not possible_words:
-            return None
+        if not mask:
+            return -1
     
-        # Count letter frequencies in remaining possible words
-        freq = defaultdict(int)
-        for word in possible_words:
-            for letter in set(word):  # Avoid double-counting repeated letters
-                if letter not in guessed_letters:
-                    freq[letter] += 1
+        # Score each unguessed letter by how many remaining words contain it
+        # Letters absent from every word of this length can't score, so skip them too
+        length = len(masked_word)
+        selectors = _bit_selectors(self.length_letter_mask[length] & ~guessed_mask)
+        letters = list(itertools.compress(range(26), selectors))
+        if not letters:
+            return -1
+        bits = itertools.compress(self.contains_bits[length], selectors)
+        counts = list(map(int.bit_count, map(mask.__and__, bits)))
+        best = max(range(len(counts)), key=counts.__getitem__)
     
         # Return letter with highest frequency
-        return max(freq.items(), key=lambda x: x[1])[0] if freq else None
+        return letters[best] if counts[best] else -1
     
+    def _color(self, *codes):
+        """colorama codes joined, or an empty string in quiet mode"""
+        return "" if self.quiet else "".join(codes)
+
+    @staticmethod
+    def _normalize(word):
+        """Strip and lowercase a user-supplied word, or None if it isn't a-z and spaces only"""
+        word = word.strip().lower()
+        # Only a-z can be guessed (one bit each in the guessed mask), so any
+        # other character would leave the word unwinnable
+        if not all(char in string.ascii_lowercase or char == " " for char in word):
+            return None
+        return word
+
     def play(self, ai_mode=False, word=None):
         """Play a game of Hangman"""
-        if ai_mode:
-            word = input(Fore.YELLOW + "Enter a word for the AI to guess (letters and spaces only): ").strip().lower()
-            while not all(char.isalpha() or char.isspace() for char in word):
-                word = input(Fore.RED + "Please enter a valid word (letters and spaces only): ").strip().lower()
+        if word is None and ai_mode:
+            word = self._normalize(input(self._color(Fore.YELLOW) + "Enter a word for the AI to guess (letters and spaces only): "))
+            while word is None:
+                word = self._normalize(input(self._color(Fore.RED) + "Please enter a valid word (letters and spaces only): "))
+        elif word is None:
+            # Dictionary words are already lowercased at load time
+            word = self.select_random_word()
         else:
-            if word is None:
-                word = self.select_random_word()
-            else:
-                word = word.lower()
+            normalized = self._normalize(word)
+            if normalized is None:
+                raise ValueError(f"Invalid word {word!r}: letters and spaces only")
+            word = normalized
         
-        masked_word = [" " if c == " " else "_" for c in word]
+        # Translate table hiding every letter not yet revealed
+        hidden = {ord(c): "_" for c in set(word) if c != " "}
+        masked_word = list(word.translate(hidden))
         word_parts = word.split()
-        part_offsets = []
-        offset = 0
-        for part in word_parts:
-            part_offsets.append((offset, offset + len(part)))
-            offset += len(part) + 1  # account for space
+        # Masked form of each part, handed to the AI as-is
+        masked_parts = [part.translate(hidden) for part in word_parts]
         current_part_index = 0
-        guessed_letters = set()
+        self._last = None
+        guessed_mask = 0  # bit ord(c) - 97 set for each guessed letter
         incorrect_guesses = 0
         max_incorrect = 6
         game_over = False
         
-        print(Fore.CYAN + "\n=== HANGMAN ===")
-        print(Fore.YELLOW + f"Word has {len(word)} letters. Good luck!")
+        print(self._color(Fore.CYAN) + "\n=== HANGMAN ===")
+        print(self._color(Fore.YELLOW) + f"Word has {len(word)} letters. Good luck!")
         
         while not game_over:
+            # In quiet mode the AI's input is held back and written with the result
+            turn_prefix = ""
+
             # Display current game state
-            self.display_game_state(masked_word, incorrect_guesses, guessed_letters)
+            if not self.quiet:
+                self.display_game_state(masked_word, incorrect_guesses, guessed_mask)
             
             # Get player's guess (or AI's guess)
             if ai_mode:
-                if current_part_index >= len(part_offsets):
-                    print(Fore.RED + "AI has completed all parts.")
+                if current_part_index >= len(masked_parts):
+                    print(self._color(Fore.RED) + "AI has completed all parts.")
                     break
 
-                start, end = part_offsets[current_part_index]
-                partial_masked = "".join(masked_word[start:end])
-                guess = self.get_best_guess(partial_masked, guessed_letters)
+                guess = self.get_best_guess(masked_parts[current_part_index], guessed_mask)
 
                 if guess is None:
                     # Fallback: pick a random letter not guessed yet
-                    unused_letters = [chr(i) for i in range(97, 123) if chr(i) not in guessed_letters]
+                    unused_letters = _mask_to_letters(~guessed_mask & _ALL_LETTERS)
                     if unused_letters:
                         guess = random.choice(unused_letters)
                     else:
-                        print(Fore.RED + "AI has no letters left to guess. Ending game.")
+                        print(self._color(Fore.RED) + "AI has no letters left to guess. Ending game.")
                         break
-                print(Fore.MAGENTA + "Input: ", end='', flush=True)
-                for char in guess:
-                    time.sleep(0.25)
-                    print(char, end='', flush=True)
-                # print()
-                time.sleep(1)
+                if self.quiet:
+                    turn_prefix = self._pfx_input + guess
+                else:
+                    sys.stdout.write(self._pfx_input)
+                    sys.stdout.flush()
+                    for char in guess:
+                        time.sleep(0.25)
+                        sys.stdout.write(char)
+                        sys.stdout.flush()
+                    time.sleep(1)
             else:
-                guess = input(Fore.GREEN + "\nGuess a letter: ").lower()
-                while not guess.isalpha() or len(guess) != 1:
-                    guess = input(Fore.RED + "Please enter a single letter: ").lower()
+                guess = input(self._color(Fore.GREEN) + "\nGuess a letter: ").lower()
+                while len(guess) != 1 or guess not in string.ascii_lowercase:
+                    guess = input(self._color(Fore.RED) + "Please enter a single letter: ").lower()
             
             # Check if letter was already guessed
-            if guess in guessed_letters:
-                print(Fore.YELLOW + "You already guessed that letter!")
+            guess_bit = 1 << (ord(guess) - 97)
+            if guessed_mask & guess_bit:
+                print(turn_prefix + self._color(Fore.YELLOW) + "You already guessed that letter!")
                 continue
                 
-            guessed_letters.add(guess)
+            guessed_mask |= guess_bit
             
             # Check if guess is correct
             if guess in word:
-                for i, letter in enumerate(word):
-                    if letter == guess:
-                        masked_word[i] = guess
-                print(Fore.GREEN + " -> Correct!")
+                del hidden[ord(guess)]
+                masked_word = list(word.translate(hidden))
+                masked_parts = [part.translate(hidden) for part in word_parts]
+                sys.stdout.write(turn_prefix + self._pfx_correct)
                 # Check if current word part is complete
-                start, end = part_offsets[current_part_index]
-                if "_" not in masked_word[start:end]:
+                if "_" not in masked_parts[current_part_index]:
                     current_part_index += 1
             else:
                 incorrect_guesses += 1
-                print(Fore.RED + f" -> Wrong! {max_incorrect - incorrect_guesses} incorrect guesses left.")
+                sys.stdout.write(f"{turn_prefix}{self._pfx_wrong}{max_incorrect - incorrect_guesses} incorrect guesses left.\n")
             
             # Check win/lose conditions
             if "_" not in masked_word:
-                self.display_game_state(masked_word, incorrect_guesses, guessed_letters)
-                print(Fore.GREEN + Style.BRIGHT + "\nCongratulations! You won!")
-                print(Fore.GREEN + f"The word was: {word}")
+                if not self.quiet:
+                    self.display_game_state(masked_word, incorrect_guesses, guessed_mask)
+                print(self._color(Fore.GREEN, Style.BRIGHT) + "\nCongratulations! You won!")
+                print(self._color(Fore.GREEN) + f"The word was: {word}")
                 game_over = True
             elif incorrect_guesses >= max_incorrect:
-                self.display_hangman(incorrect_guesses)
-                print(Fore.RED + Style.BRIGHT + "\nGame Over! You lost.")
-                print(Fore.RED + f"The word was: {word}")
+                if not self.quiet:
+                    self.display_hangman(incorrect_guesses)
+                print(self._color(Fore.RED, Style.BRIGHT) + "\nGame Over! You lost.")
+                print(self._color(Fore.RED) + f"The word was: {word}")
                 game_over = True
     
-    def display_game_state(self, masked_word, incorrect_guesses, guessed_letters):
+    def display_game_state(self, masked_word, incorrect_guesses, guessed_mask):
         """Show the current game status"""
         print("\n" + " ".join(masked_word))
         remaining = 6 - incorrect_guesses
-        print(" " * 15 + Fore.RED + f"Guesses left: {remaining}\n")
+        print(" " * 15 + self._color(Fore.RED) + f"Guesses left: {remaining}\n")
         self.display_hangman(incorrect_guesses)
-        print(Fore.BLUE + f"\nGuessed letters: {', '.join(sorted(guessed_letters))}")
+        print(self._color(Fore.BLUE) + f"\nGuessed letters: {', '.join(_mask_to_letters(guessed_mask))}")
     
     def display_hangman(self, incorrect_guesses):
         """ASCII art for hangman"""
@@ -229,7 +411,7 @@ class HangmanGame:
              |
     ============="""
         ]
-        print(Fore.YELLOW + stages[min(incorrect_guesses, 6)])
+        print(self._color(Fore.YELLOW) + stages[min(incorrect_guesses, 6)])
 
 def main():
     game = HangmanGame()
@@ -0,0 +1,63 @@
+import random
+import string
+import unittest
+
+from game import HangmanGame, _letters_to_mask
+
+
+def reference_mask(game, masked_word, guessed_letters):
+    """Candidate mask built by checking every word against the masked word directly"""
+    mask = 0
+    for i, word in enumerate(game.words_by_length.get(len(masked_word), [])):
+        if all(w == m if m != '_' else w not in guessed_letters
+               for w, m in zip(word, masked_word)):
+            mask |= 1 << i
+    return mask
+
+
+class CandidateMaskTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # One game carries _last across queries, the other always starts fresh
+        cls.incremental = HangmanGame(quiet=True)
+        cls.fresh = HangmanGame(quiet=True)
+
+    def full_mask(self, masked_word, guessed_mask):
+        self.fresh._last = None
+        return self.fresh.get_candidate_mask(masked_word, guessed_mask)
+
+    def test_incremental_matches_full_and_reference(self):
+        rng = random.Random(0)
+        words = [w for w in self.incremental.all_words if 2 <= len(w) <= 10]
+        for _ in range(300):
+            word = rng.choice(words)
+            guessed = set()
+            self.incremental._last = None
+            for _ in range(10):
+                masked_word = ''.join(c if c in guessed else '_' for c in word)
+                guessed_mask = _letters_to_mask(guessed)
+                # Cached guesses skip the candidate query, leaving _last behind
+                guess = self.incremental.get_best_guess(masked_word, guessed_mask)
+                if guess is None or rng.random() < 0.3:
+                    guess = rng.choice(string.ascii_lowercase)
+                guessed.add(guess)
+
+                masked_word = ''.join(c if c in guessed else '_' for c in word)
+                guessed_mask = _letters_to_mask(guessed)
+                mask = self.incremental.get_candidate_mask(masked_word, guessed_mask)
+                self.assertEqual(mask, self.full_mask(masked_word, guessed_mask), (word, masked_word))
+                self.assertEqual(mask, reference_mask(self.fresh, masked_word, guessed), (word, masked_word))
+
+    def test_switching_parts_falls_back_to_full_mask(self):
+        game = self.incremental
+        game._last = None
+        guessed_mask = _letters_to_mask('a')
+        game.get_candidate_mask('_a_', guessed_mask)
+        # Same length but a different part: 'a' is no longer revealed
+        guessed_mask |= _letters_to_mask('t')
+        self.assertEqual(game.get_candidate_mask('t__', guessed_mask),
+                         self.full_mask('t__', guessed_mask))
+
+
+if __name__ == "__main__":
+    unittest.main()